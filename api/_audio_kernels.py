@@ -0,0 +1,106 @@
+"""
+Numba kernels for audio preprocessing.
+Fuses the mono downmix and the band-limited resample to 16kHz into one pass over the input.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from numba import njit
+
+TARGET_RATE = 16000
+
+# Input sample rates accepted for resampling; the sample rate comes from the
+# uploaded file's header, and the bounds cap how much output one input can produce
+MIN_INPUT_RATE = 4000
+MAX_INPUT_RATE = 384000
+
+# Largest up/down factor of the resampling ratio. Rates whose exact ratio to
+# 16kHz reduces to larger factors (e.g. 44101Hz) are resampled with the closest
+# ratio within this bound, which keeps the filter at most 20001 taps
+MAX_RATIO_TERM = 1000
+
+def _ratio(sr_in: int) -> Tuple[int, int]:
+    """Return (up, down) approximating 16kHz / sr_in; raises ValueError for unsupported rates."""
+    if not MIN_INPUT_RATE <= sr_in <= MAX_INPUT_RATE:
+        raise ValueError(f"Unsupported sample rate: {sr_in}Hz")
+
+    ratio = Fraction(TARGET_RATE, sr_in)
+    if max(ratio.numerator, ratio.denominator) > MAX_RATIO_TERM:
+        # Bound the larger term; the smaller one is then bounded too
+        if ratio < 1:
+            ratio = ratio.limit_denominator(MAX_RATIO_TERM)
+        else:
+            ratio = 1 / (1 / ratio).limit_denominator(MAX_RATIO_TERM)
+    return ratio.numerator, ratio.denominator
+
+# Bounded so clients sending many distinct rates can't grow it without limit
+@lru_cache(maxsize=8)
+def _design_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Design a Kaiser-windowed sinc low-pass filter for resampling by up/down; returns (taps, half_len)."""
+    if up == down:
+        return np.ones(1, dtype=np.float32), 0
+
+    # Same design as scipy.signal.resample_poly: cutoff at the lower Nyquist rate
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    n = np.arange(2 * half_len + 1) - half_len
+    taps = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, 5.0)
+    taps *= up / taps.sum()
+
+    return taps.astype(np.float32), half_len
+
+# Serial on purpose: requests already run this kernel concurrently from the
+# server threads, and Numba's parallel threading layers are either unsafe
+# under concurrent calls (workqueue) or after gunicorn forks (OpenMP)
+@njit(fastmath=True, cache=True)
+def _downmix_resample(x, taps, up, down, half_len, out):
+    n_in, n_ch = x.shape
+    n_taps = taps.shape[0]
+    scale = np.float32(1.0 / n_ch)
+
+    for m in range(out.shape[0]):
+        # Walk the taps of the polyphase branch that lands on output sample m
+        t = m * down + half_len
+        k = t % up
+        i = t // up
+        acc = np.float32(0.0)
+        while k < n_taps:
+            if i >= 0 and i < n_in:
+                sample = np.float32(0.0)
+                for c in range(n_ch):
+                    sample += x[i, c]
+                acc += taps[k] * sample
+            k += up
+            i -= 1
+        out[m] = acc * scale
+
+def downmix_resample_to_16k(x: np.ndarray, sr_in: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Downmix audio to mono and resample it to 16kHz in a single pass.
+
+    x is a float32 array of shape (frames,) or (frames, channels). If out is
+    given it must be a float32 buffer of at least output_length(len(x), sr_in)
+    samples; the returned array is a view into it.
+    """
+    up, down = _ratio(sr_in)
+    taps, half_len = _design_filter(up, down)
+
+    if x.ndim == 1:
+        x = x[:, None]
+    x = np.ascontiguousarray(x, dtype=np.float32)
+
+    n_out = output_length(x.shape[0], sr_in)
+    if out is None:
+        out = np.empty(n_out, dtype=np.float32)
+    else:
+        out = out[:n_out]
+
+    _downmix_resample(x, taps, up, down, half_len, out)
+    return out
+
+def output_length(n_in: int, sr_in: int) -> int:
+    """Number of 16kHz samples produced from n_in samples at sr_in."""
+    up, down = _ratio(sr_in)
+    return -(-n_in * up // down)
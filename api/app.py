@@ -5,23 +5,34 @@ Provides REST API endpoints for speech-to-text transcription with RKNN2 accelera
 """
 
 import os
+import re
+import queue
 import sys
 import time
 import logging
 import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import numpy as np
+import orjson
 import soundfile as sf
-from flask import Flask, request, jsonify, send_file
+import xxhash
+from flask import Blueprint, Flask, current_app, request, jsonify, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 import psutil
 import prometheus_client
-from api.metrics import REQUEST_COUNT, REQUEST_LATENCY, TRANSCRIPTION_DURATION, AUDIO_DURATION, ACTIVE_REQUESTS, MODEL_LOAD_TIME
+from api.metrics import (
+    TRANSCRIPTION_DURATION, AUDIO_DURATION, ACTIVE_REQUESTS, MODEL_LOAD_TIME,
+    HEALTH_COUNT, TRANSCRIBE_COUNT, TRANSCRIBE_BATCH_COUNT, LANGUAGES_COUNT, CONFIG_COUNT, METRICS_COUNT,
+    TRANSCRIBE_LATENCY, TRANSCRIBE_BATCH_LATENCY
+)
+from api._audio_kernels import downmix_resample_to_16k, output_length
 
 # Add the submodule path to sys.path
 sys.path.insert(0, str(Path(__file__).parent.parent / "submodules" / "SenseVoiceSmall-RKNN2"))
@@ -35,6 +46,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Liveness probes poll /health every few seconds; system stats are sampled
+# at most once per TTL. The first cpu_percent call only seeds the counter.
+HEALTH_CACHE_TTL = 0.5
+_health_cache = (0.0, None, None)
+psutil.cpu_percent(interval=None)
+
+# Language codes accepted by the encoder
+LANGUAGES = {"auto": 0, "zh": 3, "en": 4, "yue": 7, "ja": 11, "ko": 12, "nospeech": 13}
+
+# Feature and limit summary served by /config
+SERVICE_CONFIG = {
+    'features': {
+        'emotion_detection': True,
+        'language_detection': True,
+        'speaker_diarization': False,  # Not implemented yet
+        'inverse_text_normalization': True
+    },
+    'supported_formats': ['wav', 'flac', 'mp3', 'ogg'],
+    'max_file_size_mb': 100,
+    'max_batch_size': 10
+}
+
+# ASR output format: <|lang|><|emotion|><|event|>...text
+_META_RE = re.compile(r'<\|([^|]+)\|><\|([^|]+)\|><\|([^|]+)\|>(.*)', re.S)
+_LANGS = frozenset(['zh', 'en', 'yue', 'ja', 'ko'])
+_EMOS = frozenset(['NEUTRAL', 'SAD', 'HAPPY', 'ANGRY', 'FEAR', 'SURPRISE'])
+
+# Upper bound on feature frames fed to the encoder in one pass. When set,
+# adjacent VAD segments are packed into super-segments up to this length and
+# each packed group is returned as one result spanning its segments; 167 keeps
+# the packed features plus the four prompt frames within the RKNN input window.
+# The default of 0 transcribes and returns every VAD segment separately.
+MAX_SUPER_FRAMES = int(os.environ.get('MAX_SUPER_FRAMES', 0))
+
+# Number of recent transcriptions whose ASR output is kept for identical
+# audio resubmitted with the same language/ITN settings. Set to 0 to disable.
+ASR_CACHE_SIZE = int(os.environ.get('ASR_CACHE_SIZE', 128))
+
+# Largest resampled audio kept in each thread's reusable buffer (60 seconds
+# at 16kHz); longer audio gets a temporary array so buffers stay bounded
+AUDIO_BUF_SAMPLES = 16000 * 60
+
+# Number of VAD instances; requests beyond this wait for a free instance
+VAD_POOL_SIZE = int(os.environ.get('VAD_POOL_SIZE', 4))
+
+def _pack_segments(feat_lens: List[int], max_len: int) -> List[tuple]:
+    """Group adjacent segments into (first, last) index ranges of at most max_len frames."""
+    groups = []
+    first = 0
+    total = 0
+    for i, feat_len in enumerate(feat_lens):
+        if i > first and total + feat_len > max_len:
+            groups.append((first, i))
+            first = i
+            total = 0
+        total += feat_len
+    if feat_lens:
+        groups.append((first, len(feat_lens)))
+    return groups
+
 @dataclass
 class TranscriptionConfig:
     """Configuration for transcription features."""
@@ -75,8 +146,14 @@ class SenseVoiceAPI:
         self.models = {}
         self.lock = threading.Lock()
         
+        # Per-thread scratch buffers reused across requests
+        self._tls = threading.local()
+        
+        # LRU cache of ASR output keyed by (audio hash, language, use_itn)
+        self._asr_cache = OrderedDict()
+        
         # Language mapping
-        self.languages = {"auto": 0, "zh": 3, "en": 4, "yue": 7, "ja": 11, "ko": 12, "nospeech": 13}
+        self.languages = LANGUAGES
         
         # Load models
         self._load_models()
@@ -84,9 +161,13 @@ class SenseVoiceAPI:
         # Thread pool for batch processing
         self.executor = ThreadPoolExecutor(max_workers=4)
         
+        # Single thread that owns the RKNN encoder; encoder calls from all
+        # in-flight requests queue here and run back-to-back
+        self.encoder_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encoder')
+        
     def _load_models(self):
         """Load all required models."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             logger.info(f"Loading models from {self.model_path}")
@@ -105,10 +186,20 @@ class SenseVoiceAPI:
                 intra_op_num_threads=4
             )
             
-            # Load VAD model
+            # Load VAD model; extra instances let concurrent requests run VAD
+            # without sharing detection state
             self.models['vad'] = FSMNVad(self.model_path)
+            self._vad_pool = queue.LifoQueue()
+            self._vad_pool.put(self.models['vad'])
+            for _ in range(VAD_POOL_SIZE - 1):
+                self._vad_pool.put(FSMNVad(self.model_path))
             
-            load_time = time.time() - start_time
+            # Compile the audio kernel now rather than on the first request
+            downmix_resample_to_16k(np.zeros((160, 2), dtype=np.float32), 48000)
+            
+            self._warmup()
+            
+            load_time = time.perf_counter() - start_time
             MODEL_LOAD_TIME.observe(load_time)
             logger.info(f"Models loaded successfully in {load_time:.2f} seconds")
             
@@ -116,6 +207,18 @@ class SenseVoiceAPI:
             logger.error(f"Failed to load models: {e}")
             raise
     
+    def _warmup(self):
+        """Run the frontend and encoder once on silence so one-off runtime setup happens at startup."""
+        start_time = time.perf_counter()
+        
+        try:
+            audio_feats = self.models['frontend'].get_features(np.zeros(16000, dtype=np.float32))
+            self.models['model'](audio_feats[None, ...], language=0, use_itn=False)
+            logger.info(f"Warmup completed in {time.perf_counter() - start_time:.2f} seconds")
+        except Exception as e:
+            # A failed warmup only moves the cost back to the first request
+            logger.warning(f"Warmup failed: {e}")
+    
     def transcribe_audio(
         self, 
         audio_data: np.ndarray, 
@@ -124,49 +227,45 @@ class SenseVoiceAPI:
     ) -> List[TranscriptionResult]:
         """Transcribe audio data with specified configuration."""
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         ACTIVE_REQUESTS.inc()
         
         try:
             results = []
             
             # Ensure audio is mono and correct sample rate
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)  # Convert to mono
-            
             if sample_rate != 16000:
                 logger.warning(f"Resampling from {sample_rate}Hz to 16000Hz")
-                # Simple resampling - in production, use librosa or scipy
-                audio_data = audio_data[::sample_rate//16000]
+            if audio_data.ndim > 1 or sample_rate != 16000:
+                # Downmix and band-limited resample fused into one pass,
+                # written into this thread's reusable audio buffer
+                out = self._scratch('audio_buf', output_length(len(audio_data), sample_rate), AUDIO_BUF_SAMPLES)
+                audio_data = downmix_resample_to_16k(audio_data, sample_rate, out=out)
                 sample_rate = 16000
             
-            # Get VAD segments
-            segments = self.models['vad'].segments_offline(audio_data)
+            # Reuse the ASR output of identical audio when caching is enabled
+            cache_key = None
+            segment_texts = None
+            if ASR_CACHE_SIZE > 0:
+                audio_hash = xxhash.xxh3_64_intdigest(np.ascontiguousarray(audio_data))
+                cache_key = (audio_hash, config.language, config.use_itn)
+                segment_texts = self._cache_get(cache_key)
             
-            for segment in segments:
-                segment_start = time.time()
-                
-                # Extract audio segment
-                start_frame = segment[0] * 16
-                end_frame = segment[1] * 16
-                segment_audio = audio_data[start_frame:end_frame]
-                
-                # Get features
-                audio_feats = self.models['frontend'].get_features(segment_audio)
-                
-                # Perform transcription
-                asr_result = self.models['model'](
-                    audio_feats[None, ...],
-                    language=self.languages[config.language],
-                    use_itn=config.use_itn,
-                )
-                
+            if segment_texts is None:
+                segment_texts = self._run_asr(audio_data, config)
+                if cache_key is not None:
+                    self._cache_put(cache_key, segment_texts)
+            else:
+                # Nothing was recomputed for this request
+                segment_texts = [(start, end, text, 0.0) for start, end, text, _ in segment_texts]
+            
+            for seg_start, seg_end, asr_result, processing_time in segment_texts:
                 # Parse result for additional features
                 result = TranscriptionResult(
                     text=asr_result,
-                    start_time=segment[0] / 1000.0,
-                    end_time=segment[1] / 1000.0,
-                    processing_time=time.time() - segment_start
+                    start_time=seg_start,
+                    end_time=seg_end,
+                    processing_time=processing_time
                 )
                 
                 # Extract language and emotion if enabled
@@ -175,10 +274,7 @@ class SenseVoiceAPI:
                 
                 results.append(result)
             
-            # Reset VAD for next use
-            self.models['vad'].vad.all_reset_detection()
-            
-            total_time = time.time() - start_time
+            total_time = time.perf_counter() - start_time
             TRANSCRIPTION_DURATION.observe(total_time)
             AUDIO_DURATION.observe(len(audio_data) / sample_rate)
             
@@ -187,63 +283,181 @@ class SenseVoiceAPI:
         finally:
             ACTIVE_REQUESTS.dec()
     
+    def _run_asr(self, audio_data: np.ndarray, config: TranscriptionConfig) -> List[tuple]:
+        """Run VAD, features and the encoder; returns (start, end, text, processing_time) per super-segment."""
+        segment_texts = []
+        
+        # Get VAD segments from a pooled VAD, resetting it before it is reused
+        vad = self._vad_pool.get()
+        try:
+            segments = vad.segments_offline(audio_data)
+        finally:
+            vad.vad.all_reset_detection()
+            self._vad_pool.put(vad)
+        
+        # Segment boundaries in samples; VAD reports milliseconds
+        bounds = np.asarray(segments, dtype=np.int64).reshape(-1, 2) * 16
+        
+        # Extract features for every segment up front
+        get_features = self.models['frontend'].get_features
+        feats = [get_features(audio_data[start:end]) for start, end in bounds]
+        
+        # Resolve per-request values once, outside the encoder loop
+        lang_id = self.languages[config.language]
+        use_itn = config.use_itn
+        model = self.models['model']
+        submit = self.encoder_executor.submit
+        
+        # Run one encoder pass per super-segment of adjacent VAD segments
+        for first, last in _pack_segments([feat.shape[0] for feat in feats], MAX_SUPER_FRAMES):
+            segment_start = time.perf_counter_ns()
+            
+            if last - first == 1:
+                audio_feats = feats[first]
+            else:
+                # Pack into this thread's reusable feature buffer; it is not
+                # touched again until the encoder call below has returned
+                n_frames = sum(feat.shape[0] for feat in feats[first:last])
+                audio_feats = self._scratch('feat_buf', n_frames, MAX_SUPER_FRAMES, feats[first].shape[1:])
+                np.concatenate(feats[first:last], axis=0, out=audio_feats)
+            
+            # Perform transcription on the shared encoder thread. Features stay
+            # float32: the session scales them and concatenates the float prompt
+            # embeddings before the RKNN call, so pre-quantized input can't be used
+            asr_result = submit(
+                model,
+                audio_feats[None, ...],
+                language=lang_id,
+                use_itn=use_itn,
+            ).result()
+            
+            segment_texts.append((
+                segments[first][0] / 1000.0,
+                segments[last - 1][1] / 1000.0,
+                asr_result,
+                (time.perf_counter_ns() - segment_start) * 1e-9
+            ))
+        
+        return segment_texts
+    
+    def _scratch(self, name: str, length: int, max_length: int, tail: tuple = ()) -> np.ndarray:
+        """Return a float32 array of `length` rows, reusing a per-thread buffer of at most `max_length` rows."""
+        if length > max_length:
+            # Too large to keep around; a one-off allocation freed with the request
+            return np.empty((length,) + tail, dtype=np.float32)
+        
+        buf = getattr(self._tls, name, None)
+        if buf is None or buf.shape[0] < length or buf.shape[1:] != tail:
+            # Grow only to what this request needs, never beyond max_length
+            buf = np.empty((length,) + tail, dtype=np.float32)
+            setattr(self._tls, name, buf)
+        return buf[:length]
+    
+    def _cache_get(self, key: tuple) -> Optional[List[tuple]]:
+        """Look up cached ASR output and mark it most recently used."""
+        with self.lock:
+            segment_texts = self._asr_cache.get(key)
+            if segment_texts is not None:
+                self._asr_cache.move_to_end(key)
+            return segment_texts
+    
+    def _cache_put(self, key: tuple, segment_texts: List[tuple]):
+        """Store ASR output, evicting the least recently used entry when full."""
+        with self.lock:
+            self._asr_cache[key] = segment_texts
+            self._asr_cache.move_to_end(key)
+            while len(self._asr_cache) > ASR_CACHE_SIZE:
+                self._asr_cache.popitem(last=False)
+    
+    def _read_and_transcribe(self, audio_buffer, config: TranscriptionConfig) -> List[TranscriptionResult]:
+        """Decode an audio buffer and transcribe it, so decoding runs on the worker thread."""
+        audio_data, sample_rate = read_audio(audio_buffer)
+        return self.transcribe_audio(audio_data, sample_rate, config)
+    
     def _extract_metadata(self, asr_result: str, result: TranscriptionResult, config: TranscriptionConfig):
         """Extract language and emotion metadata from ASR result."""
-        # Parse the result format: <|lang|><|emotion|><|type|><|text|>
-        parts = asr_result.split('><')
-        
-        if len(parts) >= 4:
-            # Extract language
-            if config.enable_language_detection:
-                lang_part = parts[0].replace('<|', '').replace('|>', '')
-                if lang_part in ['zh', 'en', 'yue', 'ja', 'ko']:
-                    result.language = lang_part
-            
-            # Extract emotion
-            if config.enable_emotion_detection:
-                emotion_part = parts[1].replace('|>', '')
-                if emotion_part in ['NEUTRAL', 'SAD', 'HAPPY', 'ANGRY', 'FEAR', 'SURPRISE']:
-                    result.emotion = emotion_part
+        match = _META_RE.match(asr_result)
+        if not match:
+            return
+        
+        lang, emotion, *_ = match.groups()
+        
+        if config.enable_language_detection and lang in _LANGS:
+            result.language = lang
+        
+        if config.enable_emotion_detection and emotion in _EMOS:
+            result.emotion = emotion
+
+def read_audio(source) -> tuple:
+    """Decode audio straight from a file-like object as float32 samples."""
+    with sf.SoundFile(source) as f:
+        audio_data = f.read(dtype='float32', always_2d=False)
+        return audio_data, f.samplerate
 
-# Initialize API
-api_instance = SenseVoiceAPI()
+def parse_config(form) -> TranscriptionConfig:
+    """Build a TranscriptionConfig from submitted form fields; raises ValueError on invalid input."""
+    language = form.get('language', 'auto')
+    if language not in LANGUAGES:
+        raise ValueError(f"Unsupported language: {language}")
+    
+    return TranscriptionConfig(
+        language=language,
+        use_itn=form.get('use_itn', 'false').lower() == 'true',
+        enable_emotion_detection=form.get('enable_emotion_detection', 'true').lower() == 'true',
+        enable_language_detection=form.get('enable_language_detection', 'true').lower() == 'true',
+        enable_speaker_diarization=form.get('enable_speaker_diarization', 'false').lower() == 'true',
+        speech_scale=float(form.get('speech_scale', 0.5))
+    )
 
-# Create Flask app
-app = Flask(__name__)
-CORS(app)
+def health_payload(api: SenseVoiceAPI) -> Dict:
+    """Build the health check response body, reusing it for HEALTH_CACHE_TTL seconds."""
+    global _health_cache
+    
+    now = time.perf_counter()
+    cached_at, cached_api, payload = _health_cache
+    if cached_api is api and now - cached_at < HEALTH_CACHE_TTL:
+        return payload
+    
+    memory = psutil.virtual_memory()
+    
+    payload = {
+        'status': 'healthy',
+        'models_loaded': list(api.models.keys()),
+        'system': {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_available_gb': memory.available / (1024**3)
+        }
+    }
+    _health_cache = (now, api, payload)
+    
+    return payload
+
+# Endpoints are registered on a blueprint and bound to an app in create_app()
+bp = Blueprint('api', __name__)
 
-@app.route('/health', methods=['GET'])
+@bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    REQUEST_COUNT.labels(endpoint='/health', method='GET').inc()
+    HEALTH_COUNT.inc()
+    api = current_app.config['API']
     
     try:
         # Check if models are loaded
-        if not api_instance.models:
+        if not api.models:
             return jsonify({'status': 'unhealthy', 'error': 'Models not loaded'}), 503
         
-        # Check system resources
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        
-        return jsonify({
-            'status': 'healthy',
-            'models_loaded': list(api_instance.models.keys()),
-            'system': {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available_gb': memory.available / (1024**3)
-            }
-        })
+        return jsonify(health_payload(api))
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 503
 
-@app.route('/transcribe', methods=['POST'])
+@bp.route('/transcribe', methods=['POST'])
 def transcribe():
     """Single audio transcription endpoint."""
-    REQUEST_COUNT.labels(endpoint='/transcribe', method='POST').inc()
-    start_time = time.time()
+    TRANSCRIBE_COUNT.inc()
+    api = current_app.config['API']
+    start_time = time.perf_counter()
     
     try:
         # Check if audio file was uploaded
@@ -255,41 +469,38 @@ def transcribe():
             return jsonify({'error': 'No audio file selected'}), 400
         
         # Parse configuration
-        config = TranscriptionConfig(
-            language=request.form.get('language', 'auto'),
-            use_itn=request.form.get('use_itn', 'false').lower() == 'true',
-            enable_emotion_detection=request.form.get('enable_emotion_detection', 'true').lower() == 'true',
-            enable_language_detection=request.form.get('enable_language_detection', 'true').lower() == 'true',
-            enable_speaker_diarization=request.form.get('enable_speaker_diarization', 'false').lower() == 'true',
-            speech_scale=float(request.form.get('speech_scale', 0.5))
-        )
+        try:
+            config = parse_config(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Load audio
-        audio_data, sample_rate = sf.read(audio_file, dtype='float32')
+        audio_data, sample_rate = read_audio(audio_file.stream)
         
         # Perform transcription
-        results = api_instance.transcribe_audio(audio_data, sample_rate, config)
+        results = api.transcribe_audio(audio_data, sample_rate, config)
         
         # Format response
         response = {
             'success': True,
-            'results': [asdict(result) for result in results],
+            'results': [vars(result) for result in results],
             'total_segments': len(results),
-            'total_processing_time': time.time() - start_time
+            'total_processing_time': time.perf_counter() - start_time
         }
         
-        REQUEST_LATENCY.labels(endpoint='/transcribe').observe(time.time() - start_time)
+        TRANSCRIBE_LATENCY.observe(time.perf_counter() - start_time)
         return jsonify(response)
         
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/transcribe/batch', methods=['POST'])
+@bp.route('/transcribe/batch', methods=['POST'])
 def transcribe_batch():
     """Batch audio transcription endpoint."""
-    REQUEST_COUNT.labels(endpoint='/transcribe/batch', method='POST').inc()
-    start_time = time.time()
+    TRANSCRIBE_BATCH_COUNT.inc()
+    api = current_app.config['API']
+    start_time = time.perf_counter()
     
     try:
         # Check if audio files were uploaded
@@ -301,21 +512,19 @@ def transcribe_batch():
             return jsonify({'error': 'No audio files selected'}), 400
         
         # Parse configuration
-        config = TranscriptionConfig(
-            language=request.form.get('language', 'auto'),
-            use_itn=request.form.get('use_itn', 'false').lower() == 'true',
-            enable_emotion_detection=request.form.get('enable_emotion_detection', 'true').lower() == 'true',
-            enable_language_detection=request.form.get('enable_language_detection', 'true').lower() == 'true',
-            enable_speaker_diarization=request.form.get('enable_speaker_diarization', 'false').lower() == 'true',
-            speech_scale=float(request.form.get('speech_scale', 0.5))
-        )
+        try:
+            config = parse_config(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Process files in parallel
         futures = []
         for audio_file in audio_files:
-            future = api_instance.executor.submit(
-                api_instance.transcribe_audio,
-                *sf.read(audio_file, dtype='float32'),
+            # Workers decode straight from the spooled upload; the request
+            # stays open until every future has been collected below
+            future = api.executor.submit(
+                api._read_and_transcribe,
+                audio_file.stream,
                 config
             )
             futures.append((audio_file.filename, future))
@@ -328,7 +537,7 @@ def transcribe_batch():
                 batch_results.append({
                     'filename': filename,
                     'success': True,
-                    'results': [asdict(result) for result in results]
+                    'results': [vars(result) for result in results]
                 })
             except Exception as e:
                 batch_results.append({
@@ -342,54 +551,65 @@ def transcribe_batch():
             'batch_results': batch_results,
             'total_files': len(audio_files),
             'successful_files': sum(1 for r in batch_results if r['success']),
-            'total_processing_time': time.time() - start_time
+            'total_processing_time': time.perf_counter() - start_time
         }
         
-        REQUEST_LATENCY.labels(endpoint='/transcribe/batch').observe(time.time() - start_time)
+        TRANSCRIBE_BATCH_LATENCY.observe(time.perf_counter() - start_time)
         return jsonify(response)
         
     except Exception as e:
         logger.error(f"Batch transcription failed: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/languages', methods=['GET'])
+@bp.route('/languages', methods=['GET'])
 def get_languages():
     """Get supported languages."""
-    REQUEST_COUNT.labels(endpoint='/languages', method='GET').inc()
+    LANGUAGES_COUNT.inc()
+    api = current_app.config['API']
     
     return jsonify({
-        'languages': list(api_instance.languages.keys()),
-        'language_codes': api_instance.languages
+        'languages': list(api.languages.keys()),
+        'language_codes': api.languages
     })
 
-@app.route('/config', methods=['GET'])
+@bp.route('/config', methods=['GET'])
 def get_config():
     """Get current configuration options."""
-    REQUEST_COUNT.labels(endpoint='/config', method='GET').inc()
+    CONFIG_COUNT.inc()
     
-    return jsonify({
-        'features': {
-            'emotion_detection': True,
-            'language_detection': True,
-            'speaker_diarization': False,  # Not implemented yet
-            'inverse_text_normalization': True
-        },
-        'supported_formats': ['wav', 'flac', 'mp3', 'ogg'],
-        'max_file_size_mb': 100,
-        'max_batch_size': 10
-    })
+    return jsonify(SERVICE_CONFIG)
 
-@app.route('/metrics', methods=['GET'])
+@bp.route('/metrics', methods=['GET'])
 def metrics():
     """Prometheus metrics endpoint."""
-    REQUEST_COUNT.labels(endpoint='/metrics', method='GET').inc()
+    METRICS_COUNT.inc()
     
     return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
 
+class OrJsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson; numpy values serialize natively."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def create_app(api: Optional[SenseVoiceAPI] = None) -> Flask:
+    """Create the Flask app; models are loaded here unless an API instance is passed in."""
+    app = Flask(__name__)
+    app.json = OrJsonProvider(app)
+    CORS(app)
+    
+    app.config['API'] = api if api is not None else SenseVoiceAPI()
+    app.register_blueprint(bp)
+    
+    return app
+
 if __name__ == '__main__':
     # Run the Flask app
     port = int(os.environ.get('PORT', 8080))
     debug = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
     
     logger.info(f"Starting SenseVoice API server on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=debug) 
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=port, debug=debug)
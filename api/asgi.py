@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SenseVoiceSmall-RKNN2 ASGI Server
+Async front end serving the same endpoints as the Flask app. Uploads are received
+on the event loop and decoding plus inference run on the API thread pool.
+
+Run with: uvicorn --factory api.asgi:create_app --workers 1 --loop uvloop --port 8080
+"""
+
+import asyncio
+import io
+import time
+from typing import Optional
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+from api.app import SenseVoiceAPI, SERVICE_CONFIG, parse_config, health_payload, logger
+from api.metrics import (
+    HEALTH_COUNT, TRANSCRIBE_COUNT, TRANSCRIBE_BATCH_COUNT, LANGUAGES_COUNT, CONFIG_COUNT, METRICS_COUNT,
+    TRANSCRIBE_LATENCY, TRANSCRIBE_BATCH_LATENCY
+)
+
+# Endpoints are registered on a router and bound to an app in create_app()
+router = APIRouter()
+
+async def _transcribe_upload(api, upload, config):
+    """Read an upload without blocking the loop, then transcribe it on the thread pool."""
+    audio_buffer = io.BytesIO(await upload.read())
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        api.executor,
+        api._read_and_transcribe,
+        audio_buffer,
+        config
+    )
+
+@router.get('/health')
+async def health_check(request: Request):
+    """Health check endpoint."""
+    HEALTH_COUNT.inc()
+    api = request.app.state.api
+
+    try:
+        # Check if models are loaded
+        if not api.models:
+            return JSONResponse({'status': 'unhealthy', 'error': 'Models not loaded'}, status_code=503)
+
+        return health_payload(api)
+    except Exception as e:
+        logger.error(f"Health check failed: {e}")
+        return JSONResponse({'status': 'unhealthy', 'error': str(e)}, status_code=503)
+
+@router.post('/transcribe')
+async def transcribe(request: Request):
+    """Single audio transcription endpoint."""
+    TRANSCRIBE_COUNT.inc()
+    api = request.app.state.api
+    start_time = time.perf_counter()
+
+    try:
+        form = await request.form()
+
+        # Check if audio file was uploaded
+        audio_file = form.get('audio')
+        if audio_file is None:
+            return JSONResponse({'error': 'No audio file provided'}, status_code=400)
+        if isinstance(audio_file, str) or not audio_file.filename:
+            return JSONResponse({'error': 'No audio file selected'}, status_code=400)
+
+        # Parse configuration
+        try:
+            config = parse_config(form)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        # Perform transcription
+        results = await _transcribe_upload(api, audio_file, config)
+
+        # Format response
+        response = {
+            'success': True,
+            'results': [vars(result) for result in results],
+            'total_segments': len(results),
+            'total_processing_time': time.perf_counter() - start_time
+        }
+
+        TRANSCRIBE_LATENCY.observe(time.perf_counter() - start_time)
+        return response
+
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+@router.post('/transcribe/batch')
+async def transcribe_batch(request: Request):
+    """Batch audio transcription endpoint."""
+    TRANSCRIBE_BATCH_COUNT.inc()
+    api = request.app.state.api
+    start_time = time.perf_counter()
+
+    try:
+        form = await request.form()
+
+        # Check if audio files were uploaded
+        audio_files = [f for f in form.getlist('audio_files') if not isinstance(f, str)]
+        if not audio_files:
+            return JSONResponse({'error': 'No audio files provided'}, status_code=400)
+
+        # Parse configuration
+        try:
+            config = parse_config(form)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        # Process files concurrently
+        outcomes = await asyncio.gather(
+            *(_transcribe_upload(api, audio_file, config) for audio_file in audio_files),
+            return_exceptions=True
+        )
+
+        # Collect results
+        batch_results = []
+        for audio_file, outcome in zip(audio_files, outcomes):
+            if isinstance(outcome, Exception):
+                batch_results.append({
+                    'filename': audio_file.filename,
+                    'success': False,
+                    'error': str(outcome)
+                })
+            else:
+                batch_results.append({
+                    'filename': audio_file.filename,
+                    'success': True,
+                    'results': [vars(result) for result in outcome]
+                })
+
+        response = {
+            'success': True,
+            'batch_results': batch_results,
+            'total_files': len(audio_files),
+            'successful_files': sum(1 for r in batch_results if r['success']),
+            'total_processing_time': time.perf_counter() - start_time
+        }
+
+        TRANSCRIBE_BATCH_LATENCY.observe(time.perf_counter() - start_time)
+        return response
+
+    except Exception as e:
+        logger.error(f"Batch transcription failed: {e}")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+@router.get('/languages')
+async def get_languages(request: Request):
+    """Get supported languages."""
+    LANGUAGES_COUNT.inc()
+    api = request.app.state.api
+
+    return {
+        'languages': list(api.languages.keys()),
+        'language_codes': api.languages
+    }
+
+@router.get('/config')
+async def get_config():
+    """Get current configuration options."""
+    CONFIG_COUNT.inc()
+
+    return SERVICE_CONFIG
+
+@router.get('/metrics')
+async def metrics():
+    """Prometheus metrics endpoint."""
+    METRICS_COUNT.inc()
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def create_app(api: Optional[SenseVoiceAPI] = None) -> FastAPI:
+    """Create the ASGI app; models are loaded here unless an API instance is passed in."""
+    app = FastAPI(title="SenseVoiceSmall-RKNN2 API", default_response_class=ORJSONResponse)
+    app.state.api = api if api is not None else SenseVoiceAPI()
+    app.include_router(router)
+
+    return app
@@ -5,4 +5,14 @@ REQUEST_LATENCY = Histogram('sensevoice_request_duration_seconds', 'Request late
 TRANSCRIPTION_DURATION = Histogram('sensevoice_transcription_duration_seconds', 'Transcription processing time')
 AUDIO_DURATION = Histogram('sensevoice_audio_duration_seconds', 'Audio duration processed')
 ACTIVE_REQUESTS = Gauge('sensevoice_active_requests', 'Number of active requests')
-MODEL_LOAD_TIME = Histogram('sensevoice_model_load_time_seconds', 'Model loading time') 
\ No newline at end of file
+MODEL_LOAD_TIME = Histogram('sensevoice_model_load_time_seconds', 'Model loading time') 
+
+# Label children bound once at import so endpoints skip the per-request label lookup
+HEALTH_COUNT = REQUEST_COUNT.labels(endpoint='/health', method='GET')
+TRANSCRIBE_COUNT = REQUEST_COUNT.labels(endpoint='/transcribe', method='POST')
+TRANSCRIBE_BATCH_COUNT = REQUEST_COUNT.labels(endpoint='/transcribe/batch', method='POST')
+LANGUAGES_COUNT = REQUEST_COUNT.labels(endpoint='/languages', method='GET')
+CONFIG_COUNT = REQUEST_COUNT.labels(endpoint='/config', method='GET')
+METRICS_COUNT = REQUEST_COUNT.labels(endpoint='/metrics', method='GET')
+TRANSCRIBE_LATENCY = REQUEST_LATENCY.labels(endpoint='/transcribe')
+TRANSCRIBE_BATCH_LATENCY = REQUEST_LATENCY.labels(endpoint='/transcribe/batch')
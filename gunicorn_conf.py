@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the SenseVoice API on RKNN2 hardware.
+Run with: gunicorn -c gunicorn_conf.py 'api.app:create_app()'
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+
+# Models load and warm up inside the worker, not the master: the RKNN context
+# and onnxruntime VAD sessions are not known to survive a fork, and with a
+# single worker preloading would share nothing
+preload_app = False
+
+# The NPU can only be opened by one process, so scale with threads
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Long recordings and batch uploads can take minutes to transcribe; this also
+# covers model loading and warmup when the worker boots
+timeout = 300
@@ -3,36 +3,35 @@
 Test cases for SenseVoiceSmall-RKNN2 API
 """
 
-import prometheus_client
-from prometheus_client import REGISTRY
-
-# Unregister all previously registered collectors to avoid duplicate errors in tests
-for collector in list(REGISTRY._names_to_collectors.values()):
-    try:
-        REGISTRY.unregister(collector)
-    except Exception:
-        pass
-
-# Now import the app and other modules
+import io
 import os
 import sys
 import json
+import math
 import time
-import tempfile
 import unittest
+from collections import OrderedDict
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 
 import numpy as np
 import soundfile as sf
-import requests
-from flask import Flask
-from flask.testing import FlaskClient
+from numba import njit
+
+# Add the project root to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.app import create_app, TranscriptionConfig, TranscriptionResult, _pack_segments
 
-# Add the API path to sys.path
-sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
+app = create_app()
+api_instance = app.config['API']
 
-from app import app, api_instance, TranscriptionConfig, TranscriptionResult
+@njit(cache=True, fastmath=True)
+def _fill_sine(out, freq, sr, amp):
+    """Fill out with a float32 sine wave of the given frequency and amplitude."""
+    step = 2 * math.pi * freq / sr
+    for i in range(out.size):
+        out[i] = amp * math.sin(step * i)
 
 class TestTranscriptionConfig(unittest.TestCase):
     """Test cases for TranscriptionConfig dataclass."""
@@ -93,34 +92,119 @@ class TestTranscriptionResult(unittest.TestCase):
         self.assertEqual(result.end_time, 2.5)
         self.assertEqual(result.processing_time, 0.1)
 
-class TestAPIEndpoints(unittest.TestCase):
-    """Test cases for API endpoints."""
+class TestExtractMetadata(unittest.TestCase):
+    """Test cases for ASR result metadata parsing."""
+    
+    def test_language_and_emotion(self):
+        """Test that language and emotion tags are extracted."""
+        result = TranscriptionResult(text="")
+        api_instance._extract_metadata("<|en|><|HAPPY|><|Speech|><|woitn|>hello", result, TranscriptionConfig())
+        self.assertEqual(result.language, "en")
+        self.assertEqual(result.emotion, "HAPPY")
+    
+    def test_detection_disabled(self):
+        """Test that disabled detections leave the result untouched."""
+        result = TranscriptionResult(text="")
+        config = TranscriptionConfig(enable_language_detection=False, enable_emotion_detection=False)
+        api_instance._extract_metadata("<|en|><|HAPPY|><|Speech|><|woitn|>hello", result, config)
+        self.assertIsNone(result.language)
+        self.assertIsNone(result.emotion)
+    
+    def test_unknown_tags(self):
+        """Test that unknown or missing tags are ignored."""
+        result = TranscriptionResult(text="")
+        api_instance._extract_metadata("<|nospeech|><|EMO_UNKNOWN|><|Event_UNK|>", result, TranscriptionConfig())
+        self.assertIsNone(result.language)
+        self.assertIsNone(result.emotion)
+        api_instance._extract_metadata("plain text", result, TranscriptionConfig())
+        self.assertIsNone(result.language)
+
+class TestPackSegments(unittest.TestCase):
+    """Test cases for super-segment packing."""
+    
+    def test_pack_within_limit(self):
+        """Test that adjacent segments are packed up to the frame limit."""
+        self.assertEqual(_pack_segments([50, 50, 50, 50], 100), [(0, 2), (2, 4)])
+    
+    def test_oversized_segment(self):
+        """Test that a segment longer than the limit stays on its own."""
+        self.assertEqual(_pack_segments([30, 200, 30], 100), [(0, 1), (1, 2), (2, 3)])
+    
+    def test_packing_disabled(self):
+        """Test that a zero limit keeps every segment separate."""
+        self.assertEqual(_pack_segments([10, 10, 10], 0), [(0, 1), (1, 2), (2, 3)])
+    
+    def test_no_segments(self):
+        """Test that no segments produce no groups."""
+        self.assertEqual(_pack_segments([], 100), [])
+
+class TestASRCache(unittest.TestCase):
+    """Test cases for the ASR output cache in transcribe_audio."""
     
     def setUp(self):
-        """Set up test client."""
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-        
-        # Create a temporary audio file for testing
-        self.temp_audio_file = self.create_test_audio()
+        """Stub out ASR and give each test an empty cache."""
+        patchers = [
+            patch.object(api_instance, '_run_asr', return_value=[(0.0, 1.0, "<|en|><|NEUTRAL|><|Speech|><|woitn|>hi", 0.5)]),
+            patch.object(api_instance, '_asr_cache', OrderedDict()),
+            patch('api.app.ASR_CACHE_SIZE', 2)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.run_asr = api_instance._run_asr
     
-    def tearDown(self):
-        """Clean up after tests."""
-        if os.path.exists(self.temp_audio_file):
-            os.unlink(self.temp_audio_file)
+    def transcribe(self, seed, config=None):
+        """Transcribe one second of audio that is distinct for each seed."""
+        audio_data = np.full(16000, seed * 0.01, dtype=np.float32)
+        return api_instance.transcribe_audio(audio_data, 16000, config or TranscriptionConfig())
     
-    def create_test_audio(self, duration=1.0, sample_rate=16000):
-        """Create a test audio file."""
-        # Generate a simple sine wave
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        audio_data = np.sin(2 * np.pi * 440 * t) * 0.1  # 440 Hz sine wave
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        sf.write(temp_file.name, audio_data, sample_rate)
-        temp_file.close()
+    def test_hit_skips_asr(self):
+        """Test that identical audio and settings reuse the cached output."""
+        first = self.transcribe(1)
+        second = self.transcribe(1)
+        self.assertEqual(self.run_asr.call_count, 1)
+        self.assertEqual(first[0].processing_time, 0.5)
+        self.assertEqual(second[0].processing_time, 0.0)
+        self.assertEqual(second[0].text, first[0].text)
+        self.assertEqual(second[0].language, "en")
+    
+    def test_settings_are_part_of_key(self):
+        """Test that a different language or use_itn misses the cache."""
+        self.transcribe(1)
+        self.transcribe(1, TranscriptionConfig(language="en"))
+        self.transcribe(1, TranscriptionConfig(use_itn=True))
+        self.assertEqual(self.run_asr.call_count, 3)
+    
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted at ASR_CACHE_SIZE."""
+        self.transcribe(1)
+        self.transcribe(2)
+        self.transcribe(1)  # hit; 2 is now least recently used
+        self.transcribe(3)  # evicts 2
+        self.assertEqual(len(api_instance._asr_cache), 2)
+        self.assertEqual(self.run_asr.call_count, 3)
         
-        return temp_file.name
+        self.transcribe(1)
+        self.assertEqual(self.run_asr.call_count, 3)
+        self.transcribe(2)
+        self.assertEqual(self.run_asr.call_count, 4)
+    
+    @patch('api.app.ASR_CACHE_SIZE', 0)
+    def test_cache_disabled(self):
+        """Test that ASR_CACHE_SIZE=0 runs ASR every time and stores nothing."""
+        self.transcribe(1)
+        self.transcribe(1)
+        self.assertEqual(self.run_asr.call_count, 2)
+        self.assertEqual(len(api_instance._asr_cache), 0)
+
+class TestAPIEndpointsNoAudio(unittest.TestCase):
+    """Test cases for API endpoints that do not upload audio."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up the shared test client."""
+        app.config['TESTING'] = True
+        cls.client = app.test_client()
     
     def test_health_endpoint(self):
         """Test health check endpoint."""
@@ -178,10 +262,41 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertIn('error', data)
         self.assertEqual(data['error'], 'No audio file selected')
     
-    @patch('api.app.api_instance')
-    def test_transcribe_success(self, mock_api):
+    def test_batch_transcribe_no_files(self):
+        """Test batch transcription with no files."""
+        response = self.client.post('/transcribe/batch')
+        self.assertEqual(response.status_code, 400)
+        
+        data = json.loads(response.data)
+        self.assertIn('error', data)
+        self.assertEqual(data['error'], 'No audio files provided')
+
+class TestAPIEndpointsWithAudio(unittest.TestCase):
+    """Test cases for API endpoints that upload audio."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up the shared test client and encode the test audio once."""
+        app.config['TESTING'] = True
+        cls.client = app.test_client()
+        cls.test_audio_bytes = cls.create_test_audio()
+    
+    @staticmethod
+    def create_test_audio(duration=1.0, sample_rate=16000):
+        """Create test audio as in-memory WAV bytes."""
+        # Generate a simple sine wave
+        audio_data = np.empty(int(sample_rate * duration), dtype=np.float32)
+        _fill_sine(audio_data, 440.0, sample_rate, 0.1)  # 440 Hz sine wave
+        
+        buffer = io.BytesIO()
+        sf.write(buffer, audio_data, sample_rate, format='WAV', subtype='FLOAT')
+        return buffer.getvalue()
+    
+    @patch.dict(app.config, {'API': Mock()})
+    def test_transcribe_success(self):
         """Test successful transcription."""
         # Mock the API instance
+        mock_api = app.config['API']
         mock_api.transcribe_audio.return_value = [
             TranscriptionResult(
                 text="Hello world",
@@ -193,14 +308,12 @@ class TestAPIEndpoints(unittest.TestCase):
             )
         ]
         
-        # Create test audio file
-        with open(self.temp_audio_file, 'rb') as f:
-            response = self.client.post('/transcribe', data={
-                'audio': (f, 'test.wav'),
-                'language': 'en',
-                'enable_emotion_detection': 'true',
-                'enable_language_detection': 'true'
-            })
+        response = self.client.post('/transcribe', data={
+            'audio': (io.BytesIO(self.test_audio_bytes), 'test.wav'),
+            'language': 'en',
+            'enable_emotion_detection': 'true',
+            'enable_language_detection': 'true'
+        })
         
         self.assertEqual(response.status_code, 200)
         
@@ -210,20 +323,25 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertEqual(data['total_segments'], 1)
         self.assertIn('total_processing_time', data)
     
-    def test_batch_transcribe_no_files(self):
-        """Test batch transcription with no files."""
-        response = self.client.post('/transcribe/batch')
+    def test_transcribe_invalid_language(self):
+        """Test transcription endpoint with an unsupported language."""
+        response = self.client.post('/transcribe', data={
+            'audio': (io.BytesIO(self.test_audio_bytes), 'test.wav'),
+            'language': 'xx'
+        })
         self.assertEqual(response.status_code, 400)
         
         data = json.loads(response.data)
         self.assertIn('error', data)
-        self.assertEqual(data['error'], 'No audio files provided')
+        self.assertEqual(data['error'], 'Unsupported language: xx')
     
-    @patch('api.app.api_instance')
-    def test_batch_transcribe_success(self, mock_api):
+    @patch.dict(app.config, {'API': Mock()})
+    def test_batch_transcribe_success(self):
         """Test successful batch transcription."""
-        # Mock the API instance
-        mock_api.transcribe_audio.return_value = [
+        # Mock the API instance; uploads are decoded on the real thread pool
+        mock_api = app.config['API']
+        mock_api.executor = api_instance.executor
+        mock_api._read_and_transcribe.return_value = [
             TranscriptionResult(
                 text="Hello world",
                 language="en",
@@ -234,44 +352,32 @@ class TestAPIEndpoints(unittest.TestCase):
             )
         ]
         
-        # Create test files
-        files = []
-        for i in range(2):
-            temp_file = self.create_test_audio()
-            files.append(('audio_files', (open(temp_file, 'rb'), f'test{i}.wav')))
+        # Flask test client doesn't easily support multiple files with the same field name
+        # Let's test with just one file for now, but verify the API can handle multiple files
+        # by checking the response structure
+        response = self.client.post('/transcribe/batch', data={
+            'audio_files': (io.BytesIO(self.test_audio_bytes), 'test0.wav'),
+            'language': 'en',
+            'enable_emotion_detection': 'true'
+        })
         
-        try:
-            # Flask test client doesn't easily support multiple files with the same field name
-            # Let's test with just one file for now, but verify the API can handle multiple files
-            # by checking the response structure
-            response = self.client.post('/transcribe/batch', data={
-                'audio_files': files[0][1],
-                'language': 'en',
-                'enable_emotion_detection': 'true'
-            })
-            
-            self.assertEqual(response.status_code, 200)
-            
-            data = json.loads(response.data)
-            self.assertTrue(data['success'])
-            self.assertIn('batch_results', data)
-            self.assertEqual(data['total_files'], 1)
-            self.assertEqual(data['successful_files'], 1)
-            self.assertIn('total_processing_time', data)
-            
-        finally:
-            # Clean up
-            for _, (f, _) in files:
-                f.close()
-                os.unlink(f.name)
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertIn('batch_results', data)
+        self.assertEqual(data['total_files'], 1)
+        self.assertEqual(data['successful_files'], 1)
+        self.assertIn('total_processing_time', data)
 
 class TestAPIIntegration(unittest.TestCase):
     """Integration tests for the API."""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up for integration tests."""
-        self.app = app.test_client()
-        self.app.testing = True
+        cls.app = app.test_client()
+        cls.app.testing = True
     
     def test_endpoint_availability(self):
         """Test that all endpoints are available."""
@@ -308,10 +414,11 @@ class TestAPIIntegration(unittest.TestCase):
 class TestPerformance(unittest.TestCase):
     """Performance tests for the API."""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up for performance tests."""
-        self.app = app.test_client()
-        self.app.testing = True
+        cls.app = app.test_client()
+        cls.app.testing = True
     
     def test_health_response_time(self):
         """Test health endpoint response time."""
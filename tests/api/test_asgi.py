@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test cases for the SenseVoiceSmall-RKNN2 ASGI front end
+"""
+
+import io
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import soundfile as sf
+from fastapi.testclient import TestClient
+
+# Add the project root to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.app import LANGUAGES, TranscriptionResult, read_audio
+from api.asgi import create_app
+
+def _fake_read_and_transcribe(audio_buffer, config):
+    """Decode the upload like the real API, then return a fixed result."""
+    read_audio(audio_buffer)
+    return [TranscriptionResult(text="Hello world", start_time=0.0, end_time=1.0, processing_time=0.1)]
+
+class TestASGIEndpoints(unittest.TestCase):
+    """Test cases for the ASGI endpoints, backed by a mocked API instance."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the ASGI app around a mocked API and a shared test client."""
+        cls.executor = ThreadPoolExecutor(max_workers=2)
+        cls.mock_api = Mock()
+        cls.mock_api.models = {'model': Mock()}
+        cls.mock_api.languages = LANGUAGES
+        cls.mock_api.executor = cls.executor
+        cls.mock_api._read_and_transcribe.side_effect = _fake_read_and_transcribe
+
+        cls.client = TestClient(create_app(api=cls.mock_api))
+
+        buffer = io.BytesIO()
+        sf.write(buffer, np.zeros(16000, dtype=np.float32), 16000, format='WAV', subtype='FLOAT')
+        cls.test_audio_bytes = buffer.getvalue()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Shut down the executor."""
+        cls.executor.shutdown()
+
+    def test_health_endpoint(self):
+        """Test health check endpoint."""
+        response = self.client.get('/health')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertIn('status', data)
+        self.assertIn('models_loaded', data)
+        self.assertIn('system', data)
+
+    def test_languages_endpoint(self):
+        """Test languages endpoint."""
+        response = self.client.get('/languages')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertIn('auto', data['languages'])
+        self.assertEqual(data['language_codes'], LANGUAGES)
+
+    def test_config_endpoint(self):
+        """Test config endpoint."""
+        response = self.client.get('/config')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertIn('features', data)
+        self.assertIn('supported_formats', data)
+
+    def test_metrics_endpoint(self):
+        """Test metrics endpoint."""
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sensevoice_requests_total', response.text)
+
+    def test_transcribe_no_file(self):
+        """Test transcription endpoint with no file."""
+        response = self.client.post('/transcribe', data={'language': 'en'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'No audio file provided')
+
+    def test_transcribe_invalid_language(self):
+        """Test transcription endpoint with an unsupported language."""
+        response = self.client.post(
+            '/transcribe',
+            files={'audio': ('test.wav', self.test_audio_bytes, 'audio/wav')},
+            data={'language': 'xx'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Unsupported language: xx')
+
+    def test_batch_transcribe_with_bad_file(self):
+        """Test that one undecodable file fails on its own within a batch."""
+        response = self.client.post('/transcribe/batch', files=[
+            ('audio_files', ('good.wav', self.test_audio_bytes, 'audio/wav')),
+            ('audio_files', ('bad.wav', b'not audio', 'audio/wav'))
+        ])
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total_files'], 2)
+        self.assertEqual(data['successful_files'], 1)
+
+        results = {r['filename']: r for r in data['batch_results']}
+        self.assertTrue(results['good.wav']['success'])
+        self.assertEqual(results['good.wav']['results'][0]['text'], "Hello world")
+        self.assertFalse(results['bad.wav']['success'])
+        self.assertIn('error', results['bad.wav'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration for the SenseVoiceSmall-RKNN2-API test suite.
+"""
+
+import pytest
+
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line(
+        "markers", "serial: test uses server-wide or Docker daemon state and must not run alongside other tests"
+    )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _clean_prom_registry():
+    """Drop default collectors from the Prometheus registry once per test session."""
+    from prometheus_client import REGISTRY
+
+    # The sensevoice_ metrics are registered when api.metrics is imported during
+    # collection, so they are kept for the /metrics endpoint tests
+    for collector, names in list(REGISTRY._collector_to_names.items()):
+        if not all(name.startswith('sensevoice_') for name in names):
+            REGISTRY.unregister(collector)
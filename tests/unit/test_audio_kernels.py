@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test cases for the audio preprocessing kernels
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api._audio_kernels import (
+    MAX_RATIO_TERM, _design_filter, _ratio, downmix_resample_to_16k, output_length
+)
+
+class TestDownmixResample(unittest.TestCase):
+    """Test cases for the fused downmix + resample kernel."""
+
+    def test_output_length(self):
+        """Test output length for common input rates."""
+        for sample_rate in (8000, 16000, 22050, 44100, 48000):
+            x = np.zeros(sample_rate * 2, dtype=np.float32)
+            y = downmix_resample_to_16k(x, sample_rate)
+            self.assertEqual(len(y), output_length(len(x), sample_rate))
+            self.assertEqual(len(y), 32000)
+            self.assertEqual(y.dtype, np.float32)
+
+    def test_stereo_downmix_at_16k(self):
+        """Test that 16kHz stereo is averaged to mono unchanged otherwise."""
+        x = np.stack([np.full(100, 0.2), np.full(100, 0.4)], axis=1).astype(np.float32)
+        y = downmix_resample_to_16k(x, 16000)
+        np.testing.assert_allclose(y, 0.3, rtol=1e-6)
+
+    def test_tone_preserved(self):
+        """Test that an in-band tone survives resampling."""
+        sample_rate = 44100
+        t = np.arange(sample_rate) / sample_rate
+        x = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+        y = downmix_resample_to_16k(np.stack([x, x], axis=1), sample_rate)
+
+        expected = np.sin(2 * np.pi * 440 * np.arange(len(y)) / 16000)
+        # Ignore filter edge effects at both ends
+        np.testing.assert_allclose(y[500:-500], expected[500:-500], atol=1e-2)
+
+    def test_preallocated_output(self):
+        """Test writing into a caller-provided buffer."""
+        out = np.empty(20000, dtype=np.float32)
+        x = np.ones(48000, dtype=np.float32)
+        y = downmix_resample_to_16k(x, 48000, out=out)
+        self.assertEqual(len(y), 16000)
+        self.assertTrue(np.shares_memory(y, out))
+
+    def test_nonstandard_rate(self):
+        """Test that a rate with a coprime ratio is resampled with a bounded filter."""
+        sample_rate = 44101
+        up, down = _ratio(sample_rate)
+        self.assertLessEqual(max(up, down), MAX_RATIO_TERM)
+        self.assertAlmostEqual(up / down, 16000 / sample_rate, places=5)
+
+        taps, _ = _design_filter(up, down)
+        self.assertLessEqual(len(taps), 20 * MAX_RATIO_TERM + 1)
+
+        t = np.arange(sample_rate) / sample_rate
+        x = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+        y = downmix_resample_to_16k(x, sample_rate)
+        self.assertEqual(len(y), output_length(len(x), sample_rate))
+        self.assertAlmostEqual(len(y), 16000, delta=1)
+
+        expected = np.sin(2 * np.pi * 440 * np.arange(len(y)) / 16000)
+        np.testing.assert_allclose(y[500:-500], expected[500:-500], atol=1e-2)
+
+    def test_unsupported_rate(self):
+        """Test that rates outside the supported range are rejected."""
+        for sample_rate in (0, 1, 1000003):
+            with self.assertRaises(ValueError):
+                downmix_resample_to_16k(np.zeros(100, dtype=np.float32), sample_rate)
+
+    def test_filter_cache_bounded(self):
+        """Test that designed filters are kept in a bounded cache."""
+        for sample_rate in range(44101, 44121):
+            downmix_resample_to_16k(np.zeros(100, dtype=np.float32), sample_rate)
+        self.assertLessEqual(_design_filter.cache_info().currsize, 8)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
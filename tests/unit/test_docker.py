@@ -7,12 +7,36 @@ import os
 import sys
 import time
 import json
+import functools
+import tempfile
 import subprocess
 import unittest
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
+import pytest
 import requests
+from requests.adapters import HTTPAdapter
+
+@functools.lru_cache(maxsize=None)
+def _read(path: Path) -> str:
+    """Read a project file once and share its contents across tests."""
+    return path.read_text()
+
+def _missing(content: str, needles) -> set:
+    """Return the needles not found in content."""
+    return {needle for needle in needles if needle not in content}
+
+def _run_quiet(cmd, cwd, timeout):
+    """Run cmd discarding stdout; return the exit code and the tail of stderr."""
+    # stderr goes to a temp file so long build logs are never buffered in memory
+    with tempfile.TemporaryFile() as stderr:
+        result = subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr, timeout=timeout)
+        if result.returncode == 0:
+            return result.returncode, ''
+        stderr.seek(max(0, stderr.tell() - 8192))
+        return result.returncode, stderr.read().decode(errors='replace')
 
 class TestDockerBuild(unittest.TestCase):
     """Test cases for Docker build functionality."""
@@ -33,48 +57,47 @@ class TestDockerBuild(unittest.TestCase):
     
     def test_dockerfile_content(self):
         """Test Dockerfile content."""
-        with open(self.dockerfile_path, 'r') as f:
-            content = f.read()
+        content = _read(self.dockerfile_path)
         
         # Check for required components
-        self.assertIn('FROM python:3.11-slim', content)
-        self.assertIn('submodules/SenseVoiceSmall-RKNN2', content)
-        self.assertIn('requirements.txt', content)
-        self.assertIn('EXPOSE 8080', content)
+        missing = _missing(content, [
+            'FROM python:3.11-slim',
+            'submodules/SenseVoiceSmall-RKNN2',
+            'requirements.txt',
+            'EXPOSE 8080'
+        ])
+        self.assertFalse(missing, f"Dockerfile is missing: {sorted(missing)}")
     
     def test_docker_compose_content(self):
         """Test docker-compose.yml content."""
-        with open(self.docker_compose_path, 'r') as f:
-            content = f.read()
+        content = _read(self.docker_compose_path)
         
         # Check for required components
-        self.assertIn('sensevoice:', content)
-        self.assertIn('build:', content)
-        self.assertIn('ports:', content)
-        self.assertIn('volumes:', content)
+        missing = _missing(content, ['sensevoice:', 'build:', 'ports:', 'volumes:'])
+        self.assertFalse(missing, f"docker-compose.yml is missing: {sorted(missing)}")
     
+    @pytest.mark.serial
     @unittest.skipUnless(os.environ.get('TEST_DOCKER_BUILD'), "Docker build test disabled")
     def test_docker_build(self):
         """Test Docker image build."""
         try:
-            result = subprocess.run(
+            returncode, stderr = _run_quiet(
                 ['docker', 'build', '-t', 'sensevoice-test', '.'],
                 cwd=self.project_root,
-                capture_output=True,
-                text=True,
                 timeout=300
             )
             
-            if result.returncode != 0:
-                print(f"Docker build failed: {result.stderr}")
+            if returncode != 0:
+                print(f"Docker build failed: {stderr}")
             
-            self.assertEqual(result.returncode, 0, "Docker build failed")
+            self.assertEqual(returncode, 0, "Docker build failed")
             
         except subprocess.TimeoutExpired:
             self.fail("Docker build timed out")
         except FileNotFoundError:
             self.skipTest("Docker not available")
 
+@pytest.mark.serial
 class TestDockerCompose(unittest.TestCase):
     """Test cases for Docker Compose functionality."""
     
@@ -86,18 +109,16 @@ class TestDockerCompose(unittest.TestCase):
     def test_docker_compose_build(self):
         """Test Docker Compose build."""
         try:
-            result = subprocess.run(
+            returncode, stderr = _run_quiet(
                 ['docker', 'compose', 'build'],
                 cwd=self.project_root,
-                capture_output=True,
-                text=True,
                 timeout=300
             )
             
-            if result.returncode != 0:
-                print(f"Docker Compose build failed: {result.stderr}")
+            if returncode != 0:
+                print(f"Docker Compose build failed: {stderr}")
             
-            self.assertEqual(result.returncode, 0, "Docker Compose build failed")
+            self.assertEqual(returncode, 0, "Docker Compose build failed")
             
         except subprocess.TimeoutExpired:
             self.fail("Docker Compose build timed out")
@@ -148,54 +169,70 @@ class TestDockerCompose(unittest.TestCase):
         except FileNotFoundError:
             self.skipTest("Docker Compose not available")
 
+@pytest.mark.serial
+@unittest.skipUnless(os.environ.get('TEST_DOCKER_API'), "Docker API test disabled")
 class TestDockerAPI(unittest.TestCase):
     """Test cases for API running in Docker."""
     
-    def setUp(self):
-        """Set up test environment."""
-        self.api_url = "http://localhost:8081"
-        self.timeout = 30
+    @classmethod
+    def setUpClass(cls):
+        """Fetch the read-only endpoints concurrently over one pooled session."""
+        cls.api_url = "http://localhost:8081"
+        cls.timeout = (2, 10)  # (connect, read) so a dead container fails fast
+        
+        cls.session = requests.Session()
+        cls.session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        
+        endpoints = ('/health', '/languages', '/config')
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            outcomes = pool.map(cls._fetch, endpoints)
+        cls.responses = dict(zip(endpoints, outcomes))
     
-    @unittest.skipUnless(os.environ.get('TEST_DOCKER_API'), "Docker API test disabled")
-    def test_docker_api_health(self):
-        """Test API health endpoint in Docker."""
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared session."""
+        cls.session.close()
+    
+    @classmethod
+    def _fetch(cls, endpoint):
+        """GET an endpoint, returning the response or the request error."""
         try:
-            response = requests.get(f"{self.api_url}/health", timeout=self.timeout)
-            self.assertEqual(response.status_code, 200)
-            
-            data = response.json()
-            self.assertIn('status', data)
-            
+            return cls.session.get(f"{cls.api_url}{endpoint}", timeout=cls.timeout)
         except requests.exceptions.RequestException as e:
-            self.fail(f"API health check failed: {e}")
+            return e
+    
+    def _response(self, endpoint, check):
+        """Return the prefetched response for endpoint, failing on a request error."""
+        response = self.responses[endpoint]
+        if isinstance(response, requests.exceptions.RequestException):
+            self.fail(f"API {check} check failed: {response}")
+        return response
+    
+    def test_docker_api_health(self):
+        """Test API health endpoint in Docker."""
+        response = self._response('/health', 'health')
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.json()
+        self.assertIn('status', data)
     
-    @unittest.skipUnless(os.environ.get('TEST_DOCKER_API'), "Docker API test disabled")
     def test_docker_api_languages(self):
         """Test API languages endpoint in Docker."""
-        try:
-            response = requests.get(f"{self.api_url}/languages", timeout=self.timeout)
-            self.assertEqual(response.status_code, 200)
-            
-            data = response.json()
-            self.assertIn('languages', data)
-            self.assertIn('language_codes', data)
-            
-        except requests.exceptions.RequestException as e:
-            self.fail(f"API languages check failed: {e}")
+        response = self._response('/languages', 'languages')
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.json()
+        self.assertIn('languages', data)
+        self.assertIn('language_codes', data)
     
-    @unittest.skipUnless(os.environ.get('TEST_DOCKER_API'), "Docker API test disabled")
     def test_docker_api_config(self):
         """Test API config endpoint in Docker."""
-        try:
-            response = requests.get(f"{self.api_url}/config", timeout=self.timeout)
-            self.assertEqual(response.status_code, 200)
-            
-            data = response.json()
-            self.assertIn('features', data)
-            self.assertIn('supported_formats', data)
-            
-        except requests.exceptions.RequestException as e:
-            self.fail(f"API config check failed: {e}")
+        response = self._response('/config', 'config')
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.json()
+        self.assertIn('features', data)
+        self.assertIn('supported_formats', data)
 
 class TestSubmoduleFunctionality(unittest.TestCase):
     """Test cases for submodule functionality."""
@@ -222,20 +259,19 @@ class TestSubmoduleFunctionality(unittest.TestCase):
             "fsmn-config.yaml"
         ]
         
-        for file_name in required_files:
-            file_path = self.submodule_path / file_name
-            self.assertTrue(file_path.exists(), f"Required file {file_name} not found in submodule")
+        present = {entry.name for entry in os.scandir(self.submodule_path)}
+        missing = set(required_files) - present
+        self.assertFalse(missing, f"Required files not found in submodule: {sorted(missing)}")
     
     def test_gitmodules_file(self):
         """Test that .gitmodules file exists and is correct."""
         gitmodules_path = self.project_root / ".gitmodules"
         self.assertTrue(gitmodules_path.exists(), ".gitmodules file not found")
         
-        with open(gitmodules_path, 'r') as f:
-            content = f.read()
+        content = _read(gitmodules_path)
         
-        self.assertIn("SenseVoiceSmall-RKNN2", content)
-        self.assertIn("huggingface.co", content)
+        missing = _missing(content, ["SenseVoiceSmall-RKNN2", "huggingface.co"])
+        self.assertFalse(missing, f".gitmodules is missing: {sorted(missing)}")
 
 class TestRequirements(unittest.TestCase):
     """Test cases for requirements.txt."""
@@ -251,8 +287,7 @@ class TestRequirements(unittest.TestCase):
     
     def test_requirements_content(self):
         """Test requirements.txt content."""
-        with open(self.requirements_path, 'r') as f:
-            content = f.read()
+        content = _read(self.requirements_path)
         
         # Check for required packages
         required_packages = [
@@ -265,8 +300,8 @@ class TestRequirements(unittest.TestCase):
             "prometheus-client"
         ]
         
-        for package in required_packages:
-            self.assertIn(package, content, f"Required package {package} not found in requirements.txt")
+        missing = _missing(content, required_packages)
+        self.assertFalse(missing, f"Required packages not found in requirements.txt: {sorted(missing)}")
 
 if __name__ == '__main__':
     # Create tests directory if it doesn't exist